@@ -6,10 +6,16 @@ import sys
 import whois
 import threading
 import concurrent.futures
+import os
+import re
+import hashlib
+import heapq
+from array import array
+from bisect import bisect_left
 from datetime import datetime
 from functools import lru_cache
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from io import StringIO
 import contextlib
 
@@ -25,6 +31,7 @@ class QueryResult:
     success: bool
     data: Any = None
     error: str = None
+    transient: bool = False  # Failed with an error worth retrying (timeouts etc.)
 
 class DNSLookup:
     def __init__(self, resolver: dns.resolver.Resolver):
@@ -41,10 +48,12 @@ class DNSLookup:
             return QueryResult(success=False, error=f"NXDOMAIN")
         except dns.resolver.NoAnswer:
             return QueryResult(success=False, error=f"NoAnswer")
+        except (dns.exception.Timeout, dns.resolver.NoNameservers) as e:
+            return QueryResult(success=False, error=str(e), transient=True)
         except dns.exception.DNSException as e:
             return QueryResult(success=False, error=str(e))
 
-    def get_a_records(self, domain: str, output: StringIO) -> None:
+    def get_a_records(self, domain: str, output: StringIO) -> QueryResult:
         result = self._safe_resolve(domain, 'A')
         output.write(f"{Colors.YELLOW}A Records for {domain}{Colors.ENDC}\n")
         if result.success:
@@ -52,8 +61,9 @@ class DNSLookup:
                 output.write(f"{Colors.GREEN}{record}{Colors.ENDC}\n")
         else:
             output.write(f"{Colors.RED}No A Records found ({result.error}) for {domain}{Colors.ENDC}\n")
+        return result
 
-    def get_dns_servers(self, domain: str, output: StringIO) -> None:
+    def get_dns_servers(self, domain: str, output: StringIO) -> QueryResult:
         result = self._safe_resolve(domain, 'NS')
         output.write(f"{Colors.YELLOW}DNS Servers for {domain}{Colors.ENDC}\n")
         if result.success:
@@ -61,8 +71,9 @@ class DNSLookup:
                 output.write(f"{Colors.GREEN}{record}{Colors.ENDC}\n")
         else:
             output.write(f"{Colors.RED}No DNS Servers found ({result.error}) for {domain}{Colors.ENDC}\n")
+        return result
 
-    def check_dnssec(self, domain: str, output: StringIO) -> None:
+    def check_dnssec(self, domain: str, output: StringIO) -> QueryResult:
         result = self._safe_resolve(domain, 'DS')
         if result.success:
             output.write(f"{Colors.YELLOW}DNSSEC is enabled for {domain}{Colors.ENDC}\n")
@@ -70,8 +81,9 @@ class DNSLookup:
                 output.write(f"{Colors.GREEN}{record}{Colors.ENDC}\n")
         else:
             output.write(f"{Colors.RED}DNSSEC not enabled ({result.error}) for {domain}{Colors.ENDC}\n")
+        return result
 
-    def get_mx_records(self, domain: str, output: StringIO) -> None:
+    def get_mx_records(self, domain: str, output: StringIO) -> QueryResult:
         result = self._safe_resolve(domain, 'MX')
         output.write(f"{Colors.YELLOW}MX Records for {domain}{Colors.ENDC}\n")
         if result.success:
@@ -79,8 +91,9 @@ class DNSLookup:
                 output.write(f"{Colors.GREEN}{record}{Colors.ENDC}\n")
         else:
             output.write(f"{Colors.RED}No MX Records found ({result.error}) for {domain}{Colors.ENDC}\n")
+        return result
 
-    def get_cname_records(self, domain: str, output: StringIO) -> None:
+    def get_cname_records(self, domain: str, output: StringIO) -> QueryResult:
         result = self._safe_resolve(domain, 'cname')
         output.write(f"{Colors.YELLOW}cname Records for {domain}{Colors.ENDC}\n")
         if result.success:
@@ -88,8 +101,9 @@ class DNSLookup:
                 output.write(f"{Colors.GREEN}{record}{Colors.ENDC}\n")
         else:
             output.write(f"{Colors.RED}No CNAME Records found ({result.error}) for {domain}{Colors.ENDC}\n")
+        return result
 
-    def get_txt_records(self, domain: str, output: StringIO) -> None:
+    def get_txt_records(self, domain: str, output: StringIO) -> QueryResult:
         result = self._safe_resolve(domain, 'TXT')
         output.write(f"{Colors.YELLOW}TXT records for {domain}{Colors.ENDC}\n")
         if result.success:
@@ -97,8 +111,9 @@ class DNSLookup:
                 output.write(f"{Colors.GREEN}{record}{Colors.ENDC}\n")
         else:
             output.write(f"{Colors.RED}No TXT Records found ({result.error}) for {domain}{Colors.ENDC}\n")
+        return result
 
-    def get_dmarc_policy(self, domain: str, output: StringIO) -> None:
+    def get_dmarc_policy(self, domain: str, output: StringIO) -> QueryResult:
         result = self._safe_resolve(f'_dmarc.{domain}', 'TXT')
         output.write(f"{Colors.YELLOW}DMARC Policy for {domain}{Colors.ENDC}\n")
         if result.success:
@@ -106,6 +121,7 @@ class DNSLookup:
                 output.write(f"{Colors.GREEN}{record}{Colors.ENDC}\n")
         else:
             output.write(f"{Colors.RED}No DMARC Policy found ({result.error}) for {domain}{Colors.ENDC}\n")
+        return result
 
     def reverse_lookup(self, ip: str, output: StringIO = None) -> None:
         if output is None:
@@ -147,8 +163,13 @@ class DNSLookup:
                 output.write(f"{msg}\n")
 
 class WHOISLookup:
+    # Errors worth retrying: connection/socket failures and registry rate limits
+    TRANSIENT_ERRORS = (OSError,) + tuple(
+        getattr(whois.parser, name) for name in ['WhoisQuotaExceededError'] if hasattr(whois.parser, name)
+    )
+
     @staticmethod
-    def get_whois_info(domain: str, output: StringIO = None) -> None:
+    def get_whois_info(domain: str, output: StringIO = None) -> QueryResult:
         if output is None:
             output = sys.stdout
             direct_print = True
@@ -251,17 +272,140 @@ class WHOISLookup:
                 else:
                     output.write(f"{msg}\n")
         
+        except WHOISLookup.TRANSIENT_ERRORS as e:
+            error, transient = f"Error fetching WHOIS for {domain}: {e}", True
+        except whois.parser.PywhoisError as e:
+            # Unregistered domain, unknown TLD etc. - retrying won't help
+            error, transient = f"No WHOIS information for {domain}: {e}", False
         except Exception as e:
-            msg = f"{Colors.RED}Error fetching WHOIS for {domain}: {e}{Colors.ENDC}"
-            if direct_print:
-                print(msg)
-            else:
-                output.write(f"{msg}\n")
+            error, transient = f"Error fetching WHOIS for {domain}: {e}", False
+        else:
+            return QueryResult(success=True, data=w)
+
+        msg = f"{Colors.RED}{error}{Colors.ENDC}"
+        if direct_print:
+            print(msg)
+        else:
+            output.write(f"{msg}\n")
+        return QueryResult(success=False, error=error, transient=transient)
+
+class CheckpointJournal:
+    """Append-only journal of completed domain results with a compact index.
+
+    Results are appended to the journal file as plain text (without color
+    codes) as they complete. Alongside it, ``<journal>.idx`` holds one
+    fixed-size entry per completed domain and set of lookups: a digest of
+    both, followed by the journal size once that domain's result was
+    written. A resume only has to load the index instead of re-parsing the
+    journal, and a domain is only skipped if the same lookups were done.
+    Writes are fsync'ed in batches; index entries are only written once the
+    journal data they refer to is durable, and on load the journal is cut
+    back to the last indexed offset so output from a killed batch never
+    lingers half-written. In memory the index is kept as a sorted array of
+    64-bit ints and searched with bisect.
+    """
+
+    DIGEST_SIZE = 8
+    ENTRY_SIZE = DIGEST_SIZE + 8
+    SORT_CHUNK = 1 << 20
+    ANSI_ESCAPE = re.compile(r'\033\[[0-9;]*m')
+
+    def __init__(self, path: str, batch_size: int = 100):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.batch_size = max(1, batch_size)
+        self.completed, committed = self._load_index()
+        if committed is not None:
+            self._truncate_journal(committed)
+        self._pending: List[bytes] = []
+        self._journal = open(self.path, 'ab')
+        self._offset = os.fstat(self._journal.fileno()).st_size
+        self._index = open(self.index_path, 'ab')
+
+    @classmethod
+    def _digest(cls, domain: str, lookups: List[str]) -> bytes:
+        key = f"{domain.strip().lower()}|{','.join(sorted(set(lookups)))}"
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=cls.DIGEST_SIZE).digest()
+
+    def _load_index(self) -> Tuple[array, Optional[int]]:
+        """Load completed domain digests as a sorted array and the committed journal size,
+        ignoring a torn trailing entry"""
+        try:
+            with open(self.index_path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            return array('Q'), None
+        size = self.ENTRY_SIZE
+        usable = len(data) - len(data) % size
+        if usable != len(data):
+            with open(self.index_path, 'r+b') as file:
+                file.truncate(usable)
+        entries = array('Q')
+        entries.frombytes(data[:usable])
+        del data
+        committed = entries[-1] if entries else 0
+        completed = entries[0::2]
+        del entries
+        # Sort in chunks and merge, so only one chunk is ever held as Python ints
+        runs = [array('Q', sorted(completed[i:i + self.SORT_CHUNK]))
+                for i in range(0, len(completed), self.SORT_CHUNK)]
+        del completed
+        if len(runs) == 1:
+            return runs[0], committed
+        return array('Q', heapq.merge(*runs)), committed
+
+    def _truncate_journal(self, committed: int) -> None:
+        """Drop journal output written after the last indexed entry"""
+        try:
+            with open(self.path, 'r+b') as file:
+                if os.fstat(file.fileno()).st_size > committed:
+                    file.truncate(committed)
+        except FileNotFoundError:
+            pass
+
+    def is_done(self, domain: str, lookups: List[str]) -> bool:
+        """Check the index loaded at startup for a completed domain"""
+        key = int.from_bytes(self._digest(domain, lookups), sys.byteorder)
+        i = bisect_left(self.completed, key)
+        return i < len(self.completed) and self.completed[i] == key
+
+    def record(self, domain: str, lookups: List[str], result: str) -> None:
+        """Append a domain's result, syncing to disk once a batch is full"""
+        data = self.ANSI_ESCAPE.sub('', result).encode('utf-8')
+        self._journal.write(data)
+        self._offset += len(data)
+        self._pending.append(self._digest(domain, lookups) + self._offset.to_bytes(8, sys.byteorder))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._index.write(b''.join(self._pending))
+        self._index.flush()
+        os.fsync(self._index.fileno())
+        self._pending.clear()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._journal.close()
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 class DomainProcessor:
-    def __init__(self, resolver: dns.resolver.Resolver):
+    def __init__(self, resolver: dns.resolver.Resolver, journal: Optional[CheckpointJournal] = None):
         self.dns_lookup = DNSLookup(resolver)
         self.whois_lookup = WHOISLookup()
+        self.journal = journal
         
         # Lookup method mapping for cleaner code
         self.lookup_methods = {
@@ -275,60 +419,107 @@ class DomainProcessor:
             'who': self.whois_lookup.get_whois_info
         }
 
+    def get_lookups(self, options: List[str]) -> List[str]:
+        """Determine which lookups to perform for the given options"""
+        if '-all' in options:
+            return list(self.lookup_methods.keys())
+        lookups_to_perform = []
+        for opt in options:
+            lookup_key = opt.lstrip('-')
+            if lookup_key in self.lookup_methods:
+                lookups_to_perform.append(lookup_key)
+            elif lookup_key == 'dns':  # Handle -dns alias for -ns
+                lookups_to_perform.append('ns')
+        return lookups_to_perform
+
     def process_single_domain(self, domain: str, options: List[str]) -> str:
         """Process a single domain and return formatted output"""
+        return self._lookup_domain(domain, options)[0]
+
+    def _lookup_domain(self, domain: str, options: List[str]) -> Tuple[str, bool]:
+        """Process a single domain and report whether any lookup failed transiently"""
         output = StringIO()
         output.write(f"\n{Colors.YELLOW}LOOKING UP {domain}{Colors.ENDC}\n\n")
-        
-        # Determine which lookups to perform
-        if '-all' in options:
-            lookups_to_perform = list(self.lookup_methods.keys())
-        else:
-            lookups_to_perform = []
-            for opt in options:
-                lookup_key = opt.lstrip('-')
-                if lookup_key in self.lookup_methods:
-                    lookups_to_perform.append(lookup_key)
-                elif lookup_key == 'dns':  # Handle -dns alias for -ns
-                    lookups_to_perform.append('ns')
+        transient = False
         
         # Perform lookups
-        for lookup in lookups_to_perform:
+        for lookup in self.get_lookups(options):
             if lookup in self.lookup_methods:
-                self.lookup_methods[lookup](domain, output)
+                result = self.lookup_methods[lookup](domain, output)
+                transient = transient or result.transient
                 output.write("\n")  # Add spacing between different record types
         
-        return output.getvalue()
+        return output.getvalue(), transient
 
     def process_domains_parallel(self, domains: List[str], options: List[str], max_workers: int = 5) -> None:
         """Process multiple domains in parallel but display results sequentially"""
-        if len(domains) == 1:
+        if self.journal and '--resume' in options:
+            # Skip domains already recorded in the checkpoint journal with the same lookups
+            lookups = self.get_lookups(options)
+            remaining = [domain for domain in domains if not self.journal.is_done(domain, lookups)]
+            skipped = len(domains) - len(remaining)
+            if skipped:
+                print(f"{Colors.YELLOW}Resuming: skipping {skipped} domain(s) already looked up with these options; "
+                      f"their results are in {self.journal.path}{Colors.ENDC}")
+            domains = remaining
+
+        if not domains:
+            return
+        elif len(domains) == 1:
             # Single domain - no need for threading overhead
-            result = self.process_single_domain(domains[0], options)
+            result, failed = self._lookup_domain(domains[0], options)
+            if self.journal and not failed:
+                self.journal.record(domains[0], self.get_lookups(options), result)
             print(result, end='')
+            failed_domains = [domains[0]] if failed else []
         else:
             # Multiple domains - use threading for parallel processing but collect results
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
                 # Submit all tasks and maintain order
                 future_to_domain = {
-                    executor.submit(self.process_single_domain, domain, options): domain 
+                    executor.submit(self._lookup_domain, domain, options): domain 
                     for domain in domains
                 }
                 
                 # Collect results in the order they were submitted
                 results = {}
-                for future in concurrent.futures.as_completed(future_to_domain):
-                    domain = future_to_domain[future]
-                    try:
-                        results[domain] = future.result()
-                    except Exception as e:
-                        results[domain] = f"\n{Colors.RED}Error processing {domain}: {e}{Colors.ENDC}\n"
+                failed_domains = []
+                try:
+                    for future in concurrent.futures.as_completed(future_to_domain):
+                        self._collect_result(future, future_to_domain[future], options, results, failed_domains)
+                except BaseException:
+                    # Interrupted - cancel queued domains and only wait for the ones
+                    # already running, then journal everything that finished
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    for future, domain in future_to_domain.items():
+                        if domain not in results and future.done() and not future.cancelled():
+                            self._collect_result(future, domain, options, results, failed_domains)
+                    raise
                 
                 # Print results in original order
                 for domain in domains:
                     if domain in results:
                         print(results[domain], end='')
 
+        if self.journal and failed_domains:
+            print(f"{Colors.RED}{len(failed_domains)} domain(s) had temporary lookup errors and were not checkpointed; "
+                  f"run again with --resume to retry them{Colors.ENDC}")
+
+    def _collect_result(self, future: concurrent.futures.Future, domain: str, options: List[str],
+                        results: Dict[str, str], failed_domains: List[str]) -> None:
+        """Store a finished lookup and journal it so an interrupted run can resume"""
+        try:
+            results[domain], failed = future.result()
+        except Exception as e:
+            results[domain] = f"\n{Colors.RED}Error processing {domain}: {e}{Colors.ENDC}\n"
+            failed_domains.append(domain)
+            return
+        if failed:
+            # Don't lock in timeouts and other transient errors - retry on resume
+            failed_domains.append(domain)
+        elif self.journal:
+            self.journal.record(domain, self.get_lookups(options), results[domain])
+
     def process_ip(self, ip: str, options: List[str]) -> None:
         """Process IP address lookups"""
         print(f"\n{Colors.YELLOW}LOOKING UP IP - {ip}{Colors.ENDC}\n")
@@ -364,7 +555,8 @@ def parse_arguments(args: List[str]) -> Dict[str, Any]:
         'domains': [],
         'file_path': None,
         'ip': None,
-        'custom_dns': None
+        'custom_dns': None,
+        'checkpoint': None
     }
     
     i = 0
@@ -391,6 +583,13 @@ def parse_arguments(args: List[str]) -> Dict[str, Any]:
             else:
                 print(f"{Colors.RED}Error: Missing custom DNS server after '-d' or '--dns-server'.{Colors.ENDC}")
                 sys.exit(1)
+        elif arg in ['-c', '--checkpoint']:
+            i += 1
+            if i < len(args):
+                parsed['checkpoint'] = args[i]
+            else:
+                print(f"{Colors.RED}Error: Missing journal path after '-c' or '--checkpoint'.{Colors.ENDC}")
+                sys.exit(1)
         elif arg.startswith('-'):
             parsed['options'].append(arg)
         else:
@@ -417,11 +616,16 @@ OPTIONS:
   -r <ip>        Perform reverse lookup from IP
   -d, --dns-server <server>  Specify custom DNS server
   -f <file>      Read domains from file
+  -c, --checkpoint <journal>  Append completed results to a checkpoint journal
+                 (defaults to <file>.journal when using -f)
+  --no-checkpoint  Don't write a checkpoint journal for -f
+  --resume       Skip domains already in the checkpoint journal
 
 Examples:
   ./domaintool.py -all example.com
   ./domaintool.py -a -mx example.com google.com
   ./domaintool.py -f domains.txt -who
+  ./domaintool.py -f domains.txt -all --resume
   ./domaintool.py -r 8.8.8.8
 """
     print(help_text)
@@ -443,20 +647,42 @@ def main():
         print(f"{Colors.RED}Error: At least one domain, file path, or IP address must be provided.{Colors.ENDC}")
         print_help()
 
+    # Runs over a file are checkpointed by default so they can be resumed
+    journal_path = parsed_args['checkpoint']
+    if journal_path is None and parsed_args['file_path'] and '--no-checkpoint' not in parsed_args['options']:
+        journal_path = f"{parsed_args['file_path']}.journal"
+
+    if '--resume' in parsed_args['options'] and not journal_path:
+        print(f"{Colors.RED}Error: '--resume' needs a checkpoint journal, from '-f' or given with '-c'.{Colors.ENDC}")
+        sys.exit(1)
+
     # Setup resolver
     resolver = setup_resolver(parsed_args['custom_dns'])
     print(f"{Colors.YELLOW}Using DNS Server: {resolver.nameservers}{Colors.ENDC}")
 
+    # Setup checkpoint journal
+    journal = None
+    if journal_path:
+        try:
+            journal = CheckpointJournal(journal_path)
+        except OSError as e:
+            print(f"{Colors.RED}Error opening checkpoint journal '{journal_path}': {e}{Colors.ENDC}")
+            sys.exit(1)
+
     # Initialize processor
-    processor = DomainProcessor(resolver)
+    processor = DomainProcessor(resolver, journal)
 
     # Process requests
-    if parsed_args['file_path']:
-        domains = load_domains_from_file(parsed_args['file_path'])
-        processor.process_domains_parallel(domains, parsed_args['options'])
-
-    if parsed_args['domains']:
-        processor.process_domains_parallel(parsed_args['domains'], parsed_args['options'])
+    try:
+        if parsed_args['file_path']:
+            domains = load_domains_from_file(parsed_args['file_path'])
+            processor.process_domains_parallel(domains, parsed_args['options'])
+
+        if parsed_args['domains']:
+            processor.process_domains_parallel(parsed_args['domains'], parsed_args['options'])
+    finally:
+        if journal:
+            journal.close()
 
     if parsed_args['ip']:
         processor.process_ip(parsed_args['ip'], parsed_args['options'])